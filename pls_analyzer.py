@@ -1219,7 +1219,8 @@ def optuna_progress_callback(study: optuna.study.Study, trial: optuna.trial.Froz
 def main():
     """主程序入口"""
     # 1. 初始化日志记录器，同时输出到控制台和文件
-    log_filename = os.path.join(SCRIPT_DIR, f"pls_analysis_output_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.txt")
+    log_timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+    log_filename = os.path.join(SCRIPT_DIR, f"pls_analysis_output_{log_timestamp}.txt")
     
     try:
         file_handler = logging.FileHandler(log_filename, 'w', 'utf-8')
@@ -1268,6 +1269,20 @@ def main():
     logger.info(f"数据加载完成，共 {len(main_df)} 期有效数据。")
     last_period = main_df['Seq'].iloc[-1]
 
+    # 将数据截止期写入日志文件名 (pls_analysis_output_{截止期}_{时间戳}.txt)，
+    # 奖金计算器据此直接按文件名定位报告，无需读取文件内容
+    period_log_filename = os.path.join(SCRIPT_DIR, f"pls_analysis_output_{last_period}_{log_timestamp}.txt")
+    logger.removeHandler(file_handler)
+    file_handler.close()
+    try:
+        os.replace(log_filename, period_log_filename)
+        log_filename = period_log_filename
+    except OSError as e:
+        logger.warning(f"日志文件重命名失败，继续使用原文件名: {e}")
+    file_handler = logging.FileHandler(log_filename, 'a', 'utf-8')
+    file_handler.setFormatter(detailed_formatter)
+    logger.addHandler(file_handler)
+
     # 3. 根据模式执行：优化或直接分析
     active_weights = DEFAULT_WEIGHTS.copy()
     optuna_summary = None
@@ -1515,7 +1530,7 @@ def save_analysis_report(df: pd.DataFrame, freq_data: Dict, pattern_data: Dict,
     """保存分析报告到文件"""
     try:
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        report_file = os.path.join(SCRIPT_DIR, f"pls_analysis_output_{timestamp}.txt")
+        report_file = os.path.join(SCRIPT_DIR, f"pls_analysis_output_{int(df['Seq'].iloc[-1])}_{timestamp}.txt")
         
         with open(report_file, 'w', encoding='utf-8') as f:
             f.write("排列三数据分析报告\n")
@@ -9,27 +9,57 @@
 1.  读取 `pls.csv` 文件，获取所有历史开奖数据。
 2.  确定最新的一期为"评估期"，倒数第二期为"报告数据截止期"。
 3.  根据"报告数据截止期"，在当前目录下查找对应的分析报告文件
-    (pls_analysis_output_*.txt)。
+    (pls_analysis_output_{截止期}_{时间戳}.txt；旧版不含截止期的
+    pls_analysis_output_{时间戳}.txt 报告会读取表头确认截止期)。
 4.  从找到的报告中解析出推荐的排列三号码。
 5.  使用"评估期"的实际开奖号码，核对所有推荐投注的中奖情况。
 6.  计算总奖金，并将详细的中奖结果追加记录到主报告文件 
     `latest_pls_calculation.txt` 中。
+
+可选依赖: 安装 numba (`pip install numba`) 后，中奖核对内核会被编译为本地代码；
+未安装时自动改用等价的向量化 NumPy 实现，结果完全一致。
 """
 
 import os
 import re
 import glob
 import csv
+import io
+import functools
+import itertools
+import concurrent.futures
 from datetime import datetime
 import traceback
 from typing import Optional, Tuple, List, Dict
 
+import numpy as np
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:  # 未安装 numba 时改用向量化的 NumPy 计分实现
+    def njit(*args, **kwargs):
+        return lambda func: func
+    HAVE_NUMBA = False
+
+try:
+    import pandas as pd
+except ImportError:  # 未安装 pandas 时退回逐行解析
+    pd = None
+
 # ==============================================================================
 # --- 配置区 ---
 # ==============================================================================
 
+# 脚本所在目录，所有数据与报告文件均相对于该目录
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 # 脚本需要查找的分析报告文件名的模式
 REPORT_PATTERN = "pls_analysis_output_*.txt"
+REPORT_GLOB = os.path.join(SCRIPT_DIR, REPORT_PATTERN)
+# 报告文件数达到该阈值时才并发读取报告表头
+REPORT_PARALLEL_READ_THRESHOLD = 8
+# 并发读取报告表头的线程数
+REPORT_READ_WORKERS = 8
 # 开奖数据源CSV文件
 CSV_FILE = "pls.csv"
 # 最终生成的主评估报告文件名
@@ -38,6 +68,8 @@ MAIN_REPORT_FILE = "latest_pls_calculation.txt"
 # 主报告文件中保留的最大记录数
 MAX_NORMAL_RECORDS = 10  # 保留最近10次评估
 MAX_ERROR_LOGS = 20      # 保留最近20条错误日志
+# 主报告文件中各条记录之间的分隔线
+REPORT_SEPARATOR = "=" * 60
 
 # 排列三奖金对照表 (元)
 PRIZE_VALUES = {
@@ -45,6 +77,26 @@ PRIZE_VALUES = {
     "组选3": 346,    # 组选3奖金：中奖号码中任意两位数字相同，所选号码与中奖号码相同且顺序不限
     "组选6": 173,    # 组选6奖金：所选号码与中奖号码相同且顺序不限
 }
+# 计分内核返回的奖级编码 (下标) 与奖级名称的对应关系，0 表示未中奖
+PRIZE_LEVEL_CODES = (None, "直选", "组选3", "组选6")
+# 按奖级编码索引的奖金数组，用于批量换算中奖金额
+PRIZE_LEVEL_AMOUNTS = np.array([0] + [PRIZE_VALUES[level] for level in PRIZE_LEVEL_CODES[1:]], dtype=np.int32)
+
+# 预编译的CSV校验正则表达式
+_PERIOD_RE = re.compile(r'^\d{4,7}$')
+_DRAW_NUMBER_RE = re.compile(r'\s*[+-]?\d+\s*')
+
+# 预编译的报告解析正则表达式
+_NAME_RE = re.compile(r'pls_analysis_output_(\d+)_(\d{8}_\d{6})\.txt$')
+_TIMESTAMP_RE = re.compile(r'_(\d{8}_\d{6})\.txt$')
+_CUTOFF_RE = re.compile(r'分析基于数据:\s*截至\s*(\d+)\s*期')
+_TARGET_RE = re.compile(r'本次预测目标:\s*第\s*(\d+)\s*期')
+_REC_RE = re.compile(r'注\s*\d+:\s*\[\s*(\d)\s*[,\s]\s*(\d)\s*[,\s]\s*(\d)\s*\]')
+_DUPLEX_PATTERNS = {
+    '百位': re.compile(r'百位\s*\(Top\s*\d+\):\s*([0-9\s]+)'),
+    '十位': re.compile(r'十位\s*\(Top\s*\d+\):\s*([0-9\s]+)'),
+    '个位': re.compile(r'个位\s*\(Top\s*\d+\):\s*([0-9\s]+)'),
+}
 
 # ==============================================================================
 # --- 工具函数 ---
@@ -54,10 +106,33 @@ def log_message(message: str, level: str = "INFO"):
     """一个简单的日志打印函数，用于在控制台显示脚本执行状态。"""
     print(f"[{level}] {datetime.now().strftime('%H:%M:%S')} - {message}")
 
+def decode_text_bytes(data: bytes) -> Optional[str]:
+    """依次尝试 utf-8、gbk、latin-1 解码字节内容，全部失败时返回 None。"""
+    for encoding in ('utf-8', 'gbk', 'latin-1'):
+        try:
+            return data.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return None
+
+@functools.lru_cache(maxsize=64)
+def _read_file_cached(file_path: str, mtime_ns: int, size: int) -> Optional[str]:
+    """一次性读取文件字节并解码；按 (路径, 修改时间, 大小) 缓存，文件变化后自动失效。"""
+    with open(file_path, 'rb', buffering=1 << 20) as f:
+        data = f.read()
+    content = decode_text_bytes(data)
+    if content is None:
+        return None
+    # 与文本模式 open() 的通用换行一致，统一为 \n，避免 CRLF 文件影响按行/分隔线的解析
+    return content.replace('\r\n', '\n').replace('\r', '\n')
+
 def robust_file_read(file_path: str) -> Optional[str]:
     """
     一个健壮的文件读取函数，能自动尝试多种编码格式。
 
+    文件只从磁盘读取一次，再对同一份字节依次尝试各编码解码；
+    同一次运行中重复读取未变化的文件会直接命中内存缓存。
+
     Args:
         file_path (str): 待读取文件的路径。
 
@@ -67,15 +142,14 @@ def robust_file_read(file_path: str) -> Optional[str]:
     if not os.path.exists(file_path):
         log_message(f"文件未找到: {file_path}", "ERROR")
         return None
-    encodings = ['utf-8', 'gbk', 'latin-1']
-    for encoding in encodings:
-        try:
-            with open(file_path, 'r', encoding=encoding) as f:
-                return f.read()
-        except (UnicodeDecodeError, IOError):
-            continue
-    log_message(f"无法使用任何支持的编码打开文件: {file_path}", "ERROR")
-    return None
+    try:
+        stat = os.stat(file_path)
+        content = _read_file_cached(file_path, stat.st_mtime_ns, stat.st_size)
+    except IOError:
+        content = None
+    if content is None:
+        log_message(f"无法使用任何支持的编码打开文件: {file_path}", "ERROR")
+    return content
 
 # ==============================================================================
 # --- 数据解析与查找模块 ---
@@ -99,19 +173,24 @@ def get_period_data_from_csv(csv_content: str) -> Tuple[Optional[Dict], Optional
         return None, None
     period_map, periods_list = {}, []
     try:
-        reader = csv.reader(csv_content.splitlines())
-        next(reader)  # 跳过表头
-        for i, row in enumerate(reader):
-            if len(row) >= 4 and re.match(r'^\d{4,7}$', row[0]):
-                try:
+        if pd is not None:
+            period_map, periods_list = parse_draws_with_pandas(csv_content)
+        else:
+            reader = csv.reader(csv_content.splitlines())
+            next(reader)  # 跳过表头
+            for i, row in enumerate(reader):
+                if len(row) >= 4 and _PERIOD_RE.match(row[0]):
+                    # 先用正则校验号码格式，无效行直接跳过，不在循环中触发异常处理
+                    if not all(_DRAW_NUMBER_RE.fullmatch(cell) for cell in row[1:4]):
+                        log_message(f"CSV文件第 {i+2} 行数据格式无效，已跳过: {row}", "WARNING")
+                        continue
                     period, red_1, red_2, red_3 = row[0], int(row[1]), int(row[2]), int(row[3])
                     # 验证数字范围
                     if not all(0 <= num <= 9 for num in [red_1, red_2, red_3]):
                         continue
                     period_map[period] = {'numbers': [red_1, red_2, red_3]}
                     periods_list.append(period)
-                except (ValueError, IndexError):
-                    log_message(f"CSV文件第 {i+2} 行数据格式无效，已跳过: {row}", "WARNING")
+            periods_list = sorted(periods_list, key=int)
     except Exception as e:
         log_message(f"解析CSV数据时发生严重错误: {e}", "ERROR")
         return None, None
@@ -120,7 +199,121 @@ def get_period_data_from_csv(csv_content: str) -> Tuple[Optional[Dict], Optional
         log_message("未能从CSV中解析到任何有效的开奖数据。", "WARNING")
         return None, None
         
-    return period_map, sorted(periods_list, key=int)
+    return period_map, periods_list
+
+def parse_draws_with_pandas(csv_content: str) -> Tuple[Dict, List]:
+    """
+    使用 pandas 一次性向量化解析CSV开奖数据，替代逐行的正则匹配与类型转换。
+
+    Args:
+        csv_content (str): 从CSV文件读取的字符串内容（首行为表头）。
+
+    Returns:
+        Tuple[Dict, List]: 以期号为键的开奖数据字典，以及按升序排序的期号列表。
+    """
+    columns = ['period', 'red_1', 'red_2', 'red_3']
+    number_columns = columns[1:]
+    # 号码列交给 read_csv 直接推断为整数，正常数据无需逐列再做类型转换
+    df = pd.read_csv(io.StringIO(csv_content), usecols=[0, 1, 2, 3], dtype={0: str}, na_filter=False)
+    df.columns = columns
+    
+    dirty_columns = [col for col in number_columns if not pd.api.types.is_integer_dtype(df[col])]
+    if dirty_columns:
+        # 存在无法推断为整数的列时按字符串重读，沿用逐行解析的严格校验（如拒绝 "1.0"）
+        raw = pd.read_csv(io.StringIO(csv_content), usecols=[0, 1, 2, 3], dtype=str, na_filter=False)
+        raw.columns = columns
+        for col in dirty_columns:
+            cells = raw[col]
+            df[col] = pd.to_numeric(cells.where(cells.str.fullmatch(_DRAW_NUMBER_RE)), errors='coerce')
+    numbers = df[number_columns]
+    
+    period_valid = df['period'].str.match(_PERIOD_RE, na=False)
+    numbers_valid = numbers.notna().all(axis=1)
+    number_values = numbers.to_numpy()
+    in_range = ((number_values >= 0) & (number_values <= 9)).all(axis=1)
+    
+    invalid_count = int((period_valid & ~numbers_valid).sum())
+    if invalid_count:
+        log_message(f"CSV文件中有 {invalid_count} 行开奖号码格式无效，已跳过。", "WARNING")
+    
+    mask = (period_valid & numbers_valid).to_numpy() & in_range
+    periods = df['period'].to_numpy()[mask]
+    draws = number_values[mask].astype(np.int64)
+    
+    # 期号按数值升序（稳定排序，与逐行解析的 sorted(key=int) 结果一致）
+    order = np.argsort(periods.astype(np.int64), kind='stable')
+    periods_list = periods[order].tolist()
+    period_map = {period: {'numbers': draw} for period, draw in zip(periods.tolist(), draws.tolist())}
+    return period_map, periods_list
+
+@functools.lru_cache(maxsize=256)
+def read_report_cutoff_period(file_path: str, mtime: float) -> Optional[str]:
+    """
+    读取分析报告中"分析基于数据: 截至 N 期"一行记录的数据截止期号。
+
+    报告按行流式读取，匹配到该行后立即停止，无需解码整个文件。
+    结果按 (文件路径, 修改时间) 缓存，文件被改写后会自动重新读取。
+
+    Args:
+        file_path (str): 分析报告文件路径。
+        mtime (float): 文件的修改时间，仅用作缓存键。
+
+    Returns:
+        Optional[str]: 数据截止期号，如果报告中没有该行则返回 None。
+    """
+    with open(file_path, 'rb') as f:
+        for raw_line in f:
+            match = _CUTOFF_RE.search(decode_text_bytes(raw_line))
+            if match:
+                return match.group(1)
+    return None
+
+def parse_report_timestamp(file_path: str) -> Optional[datetime]:
+    """从报告文件名末尾的 _YYYYMMDD_HHMMSS.txt 解析生成时间，无法解析时返回 None。"""
+    timestamp_match = _TIMESTAMP_RE.search(file_path)
+    if not timestamp_match:
+        return None
+    try:
+        return datetime.strptime(timestamp_match.group(1), "%Y%m%d_%H%M%S")
+    except ValueError:
+        return None
+
+def lookup_report_cutoff_period(file_path: str) -> Optional[str]:
+    """读取单个报告的数据截止期号，文件不可读时返回 None。"""
+    try:
+        return read_report_cutoff_period(file_path, os.path.getmtime(file_path))
+    except OSError:
+        return None
+
+def find_newest_legacy_report(legacy_reports: List[Tuple[datetime, str]], target_period: str) -> Optional[Tuple[datetime, str]]:
+    """
+    在旧命名（文件名不含截止期）的报告中查找截止期匹配的最新一份。
+
+    报告按生成时间从新到旧依次读取表头，命中第一份即停止；
+    报告较多时并发读取表头以重叠 I/O 等待，命中后取消尚未开始的读取。
+
+    Args:
+        legacy_reports: 已按生成时间降序排列的 (生成时间, 文件路径) 列表。
+        target_period (str): 目标报告的数据截止期号。
+
+    Returns:
+        Optional[Tuple[datetime, str]]: 匹配报告的 (生成时间, 文件路径)，未找到则返回 None。
+    """
+    # 文件很少时线程池反而得不偿失
+    if len(legacy_reports) < REPORT_PARALLEL_READ_THRESHOLD:
+        for timestamp, file_path in legacy_reports:
+            if lookup_report_cutoff_period(file_path) == target_period:
+                return timestamp, file_path
+        return None
+    
+    with concurrent.futures.ThreadPoolExecutor(max_workers=REPORT_READ_WORKERS) as executor:
+        futures = [executor.submit(lookup_report_cutoff_period, file_path) for _, file_path in legacy_reports]
+        for (timestamp, file_path), future in zip(legacy_reports, futures):
+            if future.result() == target_period:
+                for pending in futures:
+                    pending.cancel()
+                return timestamp, file_path
+    return None
 
 def find_matching_report(target_period: str) -> Optional[str]:
     """
@@ -133,29 +326,33 @@ def find_matching_report(target_period: str) -> Optional[str]:
         Optional[str]: 找到的报告文件的路径，如果未找到则返回 None。
     """
     log_message(f"正在查找数据截止期为 {target_period} 的分析报告...")
-    candidates = []
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    for file_path in glob.glob(os.path.join(script_dir, REPORT_PATTERN)):
-        content = robust_file_read(file_path)
-        if not content: continue
-        
-        match = re.search(r'分析基于数据:\s*截至\s*(\d+)\s*期', content)
-        if match and match.group(1) == target_period:
-            try:
-                timestamp_str_match = re.search(r'_(\d{8}_\d{6})\.txt$', file_path)
-                if timestamp_str_match:
-                    timestamp_str = timestamp_str_match.group(1)
-                    timestamp = datetime.strptime(timestamp_str, "%Y%m%d_%H%M%S")
-                    candidates.append((timestamp, file_path))
-            except (AttributeError, ValueError):
-                continue
+    best_report = None
+    legacy_reports = []
+    for file_path in glob.iglob(REPORT_GLOB):
+        timestamp = parse_report_timestamp(file_path)
+        if not timestamp:
+            continue
+        # 新命名的报告直接从文件名取得截止期号，无需读取文件
+        name_match = _NAME_RE.search(file_path)
+        if name_match:
+            if name_match.group(1) == target_period and (best_report is None or timestamp > best_report[0]):
+                best_report = (timestamp, file_path)
+        else:
+            legacy_reports.append((timestamp, file_path))
+    
+    # 旧命名的报告仍需读取表头，比已找到的报告更旧的文件无需再读取
+    legacy_reports.sort(reverse=True)
+    if best_report:
+        legacy_reports = [report for report in legacy_reports if report[0] > best_report[0]]
+    legacy_match = find_newest_legacy_report(legacy_reports, target_period)
+    if legacy_match:
+        best_report = legacy_match
     
-    if not candidates:
+    if not best_report:
         log_message(f"未找到数据截止期为 {target_period} 的分析报告。", "WARNING")
         return None
         
-    candidates.sort(reverse=True)
-    latest_report = candidates[0][1]
+    latest_report = best_report[1]
     log_message(f"找到匹配的最新报告: {os.path.basename(latest_report)}", "INFO")
     return latest_report
 
@@ -181,29 +378,16 @@ def parse_recommendations_from_report(content: str) -> Dict:
     }
     
     # 解析目标期号
-    target_match = re.search(r'本次预测目标:\s*第\s*(\d+)\s*期', content)
+    target_match = _TARGET_RE.search(content)
     if target_match:
         result['target_period'] = target_match.group(1)
     
     # 解析单式推荐号码
-    rec_pattern = re.compile(r'注\s*\d+:\s*\[([0-9\s,]+)\]')
-    for match in rec_pattern.finditer(content):
-        try:
-            numbers_str = match.group(1)
-            numbers = [int(x.strip()) for x in re.findall(r'\d', numbers_str)]
-            if len(numbers) == 3 and all(0 <= num <= 9 for num in numbers):
-                result['single'].append(numbers)
-        except ValueError:
-            continue
+    for match in _REC_RE.finditer(content):
+        result['single'].append([int(match.group(1)), int(match.group(2)), int(match.group(3))])
     
     # 解析复式推荐号码
-    duplex_patterns = {
-        '百位': re.compile(r'百位\s*\(Top\s*\d+\):\s*([0-9\s]+)'),
-        '十位': re.compile(r'十位\s*\(Top\s*\d+\):\s*([0-9\s]+)'),
-        '个位': re.compile(r'个位\s*\(Top\s*\d+\):\s*([0-9\s]+)')
-    }
-    
-    for position, pattern in duplex_patterns.items():
+    for position, pattern in _DUPLEX_PATTERNS.items():
         match = pattern.search(content)
         if match:
             try:
@@ -222,7 +406,86 @@ def parse_recommendations_from_report(content: str) -> Dict:
     
     return result
 
-def calculate_prize(recommendations: List[List[int]], prize_numbers: List[int]) -> Tuple[int, Dict, List]:
+@njit(cache=True)
+def _sort3(a, b, c):
+    """对三个数字排序，返回 (最小, 中间, 最大)。"""
+    lo = min(a, b, c)
+    hi = max(a, b, c)
+    return lo, a + b + c - lo - hi, hi
+
+# 首次调用时才编译（不在导入时），编译或缓存加载失败由 _score 捕获并退回 NumPy 实现。
+# cache=True 将编译结果写入 __pycache__，同一工作目录中再次运行时可直接加载，省去 JIT 编译。
+# CI 每次全新检出仓库，缓存不会保留（旧版 numba 还以源文件修改时间校验缓存），因此每次运行都会重新编译
+@njit(cache=True)
+def _score_jit(recs, prize, winners_idx, levels):
+    """
+    逐注核对推荐号码，将中奖注的下标与奖级编码（见 PRIZE_LEVEL_CODES）
+    依次写入预分配的数组前部。
+
+    Args:
+        recs: 形状为 (N, 3) 的 int8 推荐号码数组
+        prize: 长度为 3 的 int8 开奖号码数组
+        winners_idx: 长度为 N 的 int32 输出数组，存放中奖注的下标
+        levels: 长度为 N 的 int8 输出数组，存放中奖注的奖级编码
+
+    Returns:
+        中奖注数，即两个输出数组中有效数据的长度
+    """
+    winners = 0
+    p0, p1, p2 = _sort3(prize[0], prize[1], prize[2])
+    # 组选奖级只取决于开奖号码：有重复数字为组选3，否则为组选6
+    group_level = 2 if (p0 == p1 or p1 == p2) else 3
+    for i in range(recs.shape[0]):
+        a, b, c = recs[i, 0], recs[i, 1], recs[i, 2]
+        # 直选：号码与顺序完全一致
+        if a == prize[0] and b == prize[1] and c == prize[2]:
+            winners_idx[winners] = i
+            levels[winners] = 1
+            winners += 1
+            continue
+        # 组选：排序后号码与开奖号码一致
+        s0, s1, s2 = _sort3(a, b, c)
+        if s0 == p0 and s1 == p1 and s2 == p2:
+            winners_idx[winners] = i
+            levels[winners] = group_level
+            winners += 1
+    return winners
+
+def _score_numpy(recs, prize, winners_idx, levels):
+    """
+    `_score_jit` 的向量化 NumPy 实现，供未安装 numba 时使用，参数与返回值相同。
+    """
+    prize_sorted = np.sort(prize)
+    group_level = 2 if (prize_sorted[0] == prize_sorted[1] or prize_sorted[1] == prize_sorted[2]) else 3
+    exact = (recs == prize).all(axis=1)
+    group = (np.sort(recs, axis=1) == prize_sorted).all(axis=1)
+    codes = np.where(exact, 1, np.where(group, group_level, 0))
+    
+    winner_rows = np.flatnonzero(codes)
+    winner_count = len(winner_rows)
+    winners_idx[:winner_count] = winner_rows
+    levels[:winner_count] = codes[winner_rows]
+    return winner_count
+
+# 当前使用的计分实现：安装了 numba 时使用编译内核，否则使用向量化实现
+_score_impl = _score_jit if HAVE_NUMBA else _score_numpy
+
+def _score(recs, prize, winners_idx, levels):
+    """
+    调用当前的计分实现；numba 内核编译或缓存加载失败时，记录警告并
+    永久切换到 `_score_numpy`，保证计分不会因 numba 问题中断。
+    """
+    global _score_impl
+    if _score_impl is _score_numpy:
+        return _score_numpy(recs, prize, winners_idx, levels)
+    try:
+        return _score_impl(recs, prize, winners_idx, levels)
+    except Exception as e:
+        log_message(f"numba 计分内核不可用，改用 NumPy 实现: {e}", "WARNING")
+        _score_impl = _score_numpy
+        return _score_numpy(recs, prize, winners_idx, levels)
+
+def calculate_prize(recommendations: List[List[int]], prize_numbers: List[int]) -> Tuple[int, Dict, Dict]:
     """
     计算排列三推荐号码的中奖情况和总奖金
 
@@ -231,52 +494,44 @@ def calculate_prize(recommendations: List[List[int]], prize_numbers: List[int])
         prize_numbers: 开奖号码 [百位, 十位, 个位]
 
     Returns:
-        Tuple[int, Dict, List]: (总奖金, 奖级统计, 中奖详情)
+        Tuple[int, Dict, Dict]: (总奖金, 奖级统计, 中奖详情)
+        中奖详情以并列的 NumPy 数组保存，各数组第 i 项对应第 i 注中奖号码:
+        {
+            'ticket_id': int32[M],     # 注号（从1开始）
+            'numbers': int8[M, 3],     # 号码
+            'prize_level': int8[M],    # 奖级编码，见 PRIZE_LEVEL_CODES
+            'amount': int32[M]         # 奖金
+        }
     """
-    total_prize = 0
-    prize_counts = {}
-    winning_details = []
+    # 每注固定3个号码，直接按扁平序列填充数组，比 np.asarray 逐个解析嵌套列表更快
+    recs = np.fromiter(
+        itertools.chain.from_iterable(recommendations), dtype=np.int8, count=3 * len(recommendations)
+    ).reshape(-1, 3)
+    prize = np.asarray(prize_numbers, dtype=np.int8)
     
-    for i, rec_numbers in enumerate(recommendations):
-        # 检查直选
-        if rec_numbers == prize_numbers:
-            prize_level = "直选"
-            prize_amount = PRIZE_VALUES[prize_level]
-            total_prize += prize_amount
-            prize_counts[prize_level] = prize_counts.get(prize_level, 0) + 1
-            winning_details.append({
-                'ticket_id': i + 1,
-                'numbers': rec_numbers,
-                'prize_level': prize_level,
-                'amount': prize_amount
-            })
-            continue
-        
-        # 检查组选
-        rec_set = set(rec_numbers)
-        prize_set = set(prize_numbers)
-        
-        if rec_set == prize_set:
-            # 判断组选类型
-            if len(rec_set) == 3:
-                prize_level = "组选6"  # 三个数字都不同
-            else:
-                prize_level = "组选3"  # 有重复数字
-            
-            prize_amount = PRIZE_VALUES[prize_level]
-            total_prize += prize_amount
-            prize_counts[prize_level] = prize_counts.get(prize_level, 0) + 1
-            winning_details.append({
-                'ticket_id': i + 1,
-                'numbers': rec_numbers,
-                'prize_level': prize_level,
-                'amount': prize_amount
-            })
+    n = recs.shape[0]
+    winners_idx = np.empty(n, dtype=np.int32)
+    levels = np.empty(n, dtype=np.int8)
+    winner_count = _score(recs, prize, winners_idx, levels)
+    winners_idx = winners_idx[:winner_count]
+    levels = levels[:winner_count]
+    amounts = PRIZE_LEVEL_AMOUNTS[levels]
     
-    return total_prize, prize_counts, winning_details
+    level_counts = np.bincount(levels, minlength=len(PRIZE_LEVEL_CODES))
+    prize_counts = {
+        PRIZE_LEVEL_CODES[code]: int(count)
+        for code, count in enumerate(level_counts) if code and count
+    }
+    winning_details = {
+        'ticket_id': winners_idx + 1,
+        'numbers': recs[winners_idx],
+        'prize_level': levels,
+        'amount': amounts
+    }
+    return int(amounts.sum()), prize_counts, winning_details
 
-def format_winning_details(winning_details: List[Dict], prize_numbers: List[int], duplex_data: Dict = None, target_period: str = "") -> List[str]:
-    """格式化中奖详情为报告字符串，包含复式信息"""
+def format_winning_details(winning_details: Dict, prize_numbers: List[int], duplex_data: Dict = None, target_period: str = "") -> List[str]:
+    """格式化中奖详情（calculate_prize 返回的并列数组）为报告字符串，包含复式信息"""
     lines = []
     
     # 添加期号和开奖号码信息
@@ -287,13 +542,18 @@ def format_winning_details(winning_details: List[Dict], prize_numbers: List[int]
     lines.append("")
     
     # 添加中奖详情
-    if not winning_details:
+    if not len(winning_details['ticket_id']):
         lines.append("本期推荐号码未中奖。")
     else:
         lines.append("🎉 中奖详情:")
-        for detail in winning_details:
-            numbers_str = f"{detail['numbers'][0]}{detail['numbers'][1]}{detail['numbers'][2]}"
-            lines.append(f"第{detail['ticket_id']}注: {numbers_str} - {detail['prize_level']} - {detail['amount']}元")
+        for ticket_id, numbers, level, amount in zip(
+            winning_details['ticket_id'].tolist(),
+            winning_details['numbers'].tolist(),
+            winning_details['prize_level'].tolist(),
+            winning_details['amount'].tolist()
+        ):
+            numbers_str = f"{numbers[0]}{numbers[1]}{numbers[2]}"
+            lines.append(f"第{ticket_id}注: {numbers_str} - {PRIZE_LEVEL_CODES[level]} - {amount}元")
     
     lines.append("")
     
@@ -312,10 +572,38 @@ def format_winning_details(winning_details: List[Dict], prize_numbers: List[int]
     
     return lines
 
+def trim_report_blocks(existing_content: str, max_normal: int, max_error: int) -> List[str]:
+    """
+    将主报告内容按分隔线拆分为记录，并分别保留最近的评估记录与错误日志。
+
+    Args:
+        existing_content (str): 主报告文件的现有内容（新记录在前）。
+        max_normal (int): 最多保留的评估记录数。
+        max_error (int): 最多保留的错误日志数。
+
+    Returns:
+        List[str]: 保留下来的记录文本列表，保持原有顺序。
+    """
+    kept_blocks = []
+    normal_count, error_count = 0, 0
+    for block in existing_content.split("\n" + REPORT_SEPARATOR + "\n"):
+        block = block.strip("\n")
+        if not block:
+            continue
+        if block.startswith("错误时间"):
+            if error_count >= max_error:
+                continue
+            error_count += 1
+        else:
+            if normal_count >= max_normal:
+                continue
+            normal_count += 1
+        kept_blocks.append(block)
+    return kept_blocks
+
 def manage_report(new_entry: Optional[Dict] = None, new_error: Optional[str] = None):
     """管理主报告文件，添加新记录并保持文件大小"""
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    report_path = os.path.join(script_dir, MAIN_REPORT_FILE)
+    report_path = os.path.join(SCRIPT_DIR, MAIN_REPORT_FILE)
     
     # 读取现有内容
     existing_content = ""
@@ -323,10 +611,10 @@ def manage_report(new_entry: Optional[Dict] = None, new_error: Optional[str] = N
         existing_content = robust_file_read(report_path) or ""
     
     # 准备新内容
-    new_content_lines = []
+    new_blocks = []
     
     if new_entry:
-        new_content_lines.extend([
+        entry_lines = [
             f"评估时间: {new_entry['timestamp']}",
             f"评估期号: {new_entry['period']}",
             f"开奖号码: {new_entry['prize_numbers']}",
@@ -334,33 +622,44 @@ def manage_report(new_entry: Optional[Dict] = None, new_error: Optional[str] = N
             f"中奖注数: {new_entry['winning_count']}",
             f"总奖金: {new_entry['total_prize']}元",
             ""
-        ])
+        ]
         
         if new_entry.get('winning_details'):
-            new_content_lines.extend(new_entry['winning_details'])
+            entry_lines.extend(new_entry['winning_details'])
         
-        new_content_lines.extend(["", "=" * 60, ""])
+        new_blocks.append("\n".join(entry_lines).rstrip("\n"))
     
     if new_error:
-        new_content_lines.extend([
+        new_blocks.append("\n".join([
             f"错误时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-            f"错误信息: {new_error}",
-            "", "=" * 60, ""
-        ])
+            f"错误信息: {new_error}"
+        ]))
     
-    # 合并内容
-    if new_content_lines:
-        final_content = "\n".join(new_content_lines) + "\n" + existing_content
-    else:
-        final_content = existing_content
+    # 按上限裁剪旧记录，新记录在前
+    kept_blocks = trim_report_blocks(
+        existing_content,
+        MAX_NORMAL_RECORDS - (1 if new_entry else 0),
+        MAX_ERROR_LOGS - (1 if new_error else 0)
+    )
+    block_end = f"\n\n{REPORT_SEPARATOR}\n\n"
     
-    # 写入文件
+    # 先写入同目录下的临时文件，再原子替换，避免写入中断导致报告损坏；
+    # 各条记录直接写入文件缓冲区，不再拼接出完整的报告字符串
+    tmp_path = report_path + ".tmp"
     try:
-        with open(report_path, 'w', encoding='utf-8') as f:
-            f.write(final_content)
+        with open(tmp_path, 'w', encoding='utf-8', buffering=1 << 16) as f:
+            for block in new_blocks + kept_blocks:
+                f.write(block)
+                f.write(block_end)
+        os.replace(tmp_path, report_path)
         log_message(f"报告已更新: {report_path}")
     except Exception as e:
         log_message(f"写入报告文件失败: {e}", "ERROR")
+        # 清理写入失败留下的临时文件，避免其残留在报告旁
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
 
 def main_process():
     """主处理流程"""
@@ -368,8 +667,7 @@ def main_process():
         log_message("开始排列三推荐结果验证...")
         
         # 读取CSV数据
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        csv_path = os.path.join(script_dir, CSV_FILE)
+        csv_path = os.path.join(SCRIPT_DIR, CSV_FILE)
         csv_content = robust_file_read(csv_path)
         
         if not csv_content:
@@ -413,6 +711,7 @@ def main_process():
         
         # 计算中奖情况
         total_prize, prize_counts, winning_details = calculate_prize(recommendations, prize_numbers)
+        winning_count = len(winning_details['ticket_id'])
         
         # 格式化结果（包含复式信息）
         winning_details_formatted = format_winning_details(
@@ -428,7 +727,7 @@ def main_process():
             'period': eval_period,
             'prize_numbers': f"{prize_numbers[0]}{prize_numbers[1]}{prize_numbers[2]}",
             'total_recommendations': len(recommendations),
-            'winning_count': len(winning_details),
+            'winning_count': winning_count,
             'total_prize': total_prize,
             'winning_details': winning_details_formatted,
             'duplex_info': duplex_data
@@ -438,13 +737,13 @@ def main_process():
         manage_report(new_entry=report_entry)
         
         # 输出结果
-        log_message(f"验证完成！推荐{len(recommendations)}注，中奖{len(winning_details)}注，总奖金{total_prize}元")
+        log_message(f"验证完成！推荐{len(recommendations)}注，中奖{winning_count}注，总奖金{total_prize}元")
         
         if duplex_data:
             duplex_summary = ', '.join([f"{pos}:{len(nums)}个" for pos, nums in duplex_data.items()])
             log_message(f"复式推荐: {duplex_summary}")
         
-        if winning_details:
+        if winning_count:
             log_message("中奖详情:")
             for line in winning_details_formatted:
                 log_message(f"  {line}")